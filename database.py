@@ -5,7 +5,9 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -22,34 +24,126 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    _client = AsyncIOMotorClient(
+        database_url,
+        maxPoolSize=50,
+        minPoolSize=10,
+        maxIdleTimeMS=60000,
+        serverSelectionTimeoutMS=2000,
+        compressors="zstd,zlib",
+        retryWrites=True,
+    )
     db = _client[database_name]
 
-# Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
+def _prepare_document(data: Union[BaseModel, dict]) -> dict:
+    """Build the stored document for a payload, stamping created/updated times"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
-    # Convert Pydantic model to dict if needed
+    # Convert Pydantic model to dict if needed, leaving unset optional fields out of the document
     if isinstance(data, BaseModel):
-        data_dict = data.model_dump()
+        data_dict = data.model_dump(exclude_none=True)
     else:
         data_dict = data.copy()
 
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
+    return data_dict
 
-    result = db[collection_name].insert_one(data_dict)
+# Helper functions for common database operations
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp"""
+    result = await db[collection_name].insert_one(_prepare_document(data))
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+class DocumentBatcher:
+    """Coalesce single-document inserts into one collection into unordered insert_many calls.
+
+    A batch is flushed once it holds `max_batch` documents or `max_delay` seconds after
+    its first document arrived, whichever comes first. Each caller gets its own id back.
+    """
+
+    def __init__(self, collection_name: str, max_batch: int = 50, max_delay: float = 0.1):
+        self.collection_name = collection_name
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+        self._flushes = set()
+
+    async def insert(self, data: Union[BaseModel, dict]) -> str:
+        """Queue a document with timestamp and wait for its batch to be written"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((_prepare_document(data), future))
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def flush(self):
+        """Write any queued documents now, e.g. on shutdown"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._write(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: list):
+        failed = {}
+        try:
+            # insert_many assigns each document's _id before sending
+            await db[self.collection_name].insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: e for err in e.details.get("writeErrors", [])}
+        except Exception as e:
+            failed = {i: e for i in range(len(batch))}
+
+        for i, (doc, future) in enumerate(batch):
+            if future.done():
+                continue
+            if i in failed:
+                future.set_exception(failed[i])
+            else:
+                future.set_result(str(doc["_id"]))
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None,
+                        sort: list = None, projection: dict = None, defaults: dict = None):
+    """Get documents from collection with `_id` stringified server-side
+
+    `defaults` maps field names to values filled in where a document lacks the field,
+    e.g. optional fields that `create_document` leaves out when they are None.
+    """
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
-    cursor = db[collection_name].find(filter_dict or {})
+    # Shape documents server-side so callers get JSON-ready string ids
+    pipeline = [{"$match": filter_dict or {}}]
+    if sort:
+        pipeline.append({"$sort": dict(sort)})
     if limit:
-        cursor = cursor.limit(limit)
-    
-    return list(cursor)
+        pipeline.append({"$limit": limit})
+    added_fields = {"_id": {"$toString": "$_id"}}
+    for field, value in (defaults or {}).items():
+        added_fields[field] = {"$ifNull": ["$" + field, value]}
+    pipeline.append({"$addFields": added_fields})
+    if projection:
+        pipeline.append({"$project": projection})
+
+    # Size the first batch to the limit so results arrive without a getMore round trip
+    options = {"batchSize": limit} if limit else {}
+    cursor = db[collection_name].aggregate(pipeline, **options)
+    return await cursor.to_list(length=limit)
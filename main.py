@@ -1,43 +1,149 @@
+import gzip
+import logging
 import os
-from typing import List, Optional
-from fastapi import FastAPI, HTTPException
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from bson import ObjectId
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
 
-from database import db, create_document, get_documents
+from database import db, create_document, get_documents, DocumentBatcher
 from schemas import Trip, Booking, Review, FAQ, Inquiry
 
-app = FastAPI(title="Gulf Global Tours API")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pay connection, index and serialization costs before the first request arrives.
+    # Failures are only logged: the app still starts, /test reports the database error
+    # and the caches fill lazily on first use.
+    if db is not None:
+        try:
+            await db.command("ping")
+            # Lets /faqs sort by (order, question) straight off the index
+            await db["faq"].create_index([("order", 1), ("question", 1)])
+            try:
+                await db["trip"].create_index("trip_type", unique=True)
+                await db["faq"].create_index("question", unique=True)
+            except OperationFailure as e:
+                # Databases double-seeded before /seed became an upsert need duplicates removed first
+                logger.warning("Could not create unique trip_type/question indexes, remove duplicate documents: %s", e)
+            await _warm_cache()
+        except Exception as e:
+            logger.warning("Database startup tasks failed, continuing without them: %s", e)
+    yield
+    await inquiry_batcher.flush()
+    await review_batcher.flush()
+
+
+app = FastAPI(
+    title="Gulf Global Tours API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_credentials=True,
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Responses that already carry Content-Encoding (the cached catalog bodies) pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
 
 
-# Utilities
-class ObjectIdStr(BaseModel):
-    id: str
+# Inquiries and reviews are written in small coalesced batches
+inquiry_batcher = DocumentBatcher("inquiry")
+review_batcher = DocumentBatcher("review")
 
 
-def oid(id_str: str) -> ObjectId:
-    try:
-        return ObjectId(id_str)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid id")
+# In-process cache of pre-serialized JSON bodies for static content:
+# key -> (expires_at, body, gzipped body or None when too small to be worth compressing).
+# The cache is per worker process: /seed only clears it in the worker that serves the
+# request, so other workers can serve their previous body until it expires.
+CACHE_TTL_SECONDS = 60
+GZIP_MINIMUM_SIZE = 512
+_response_cache = {}
+
+
+def _cache_get(key: str) -> Optional[Tuple[bytes, Optional[bytes]]]:
+    entry = _response_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1:]
+    return None
+
+
+def _cache_set(key: str, docs: list) -> Tuple[bytes, Optional[bytes]]:
+    body = orjson.dumps(docs)
+    gzipped = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MINIMUM_SIZE else None
+    _response_cache[key] = (time.monotonic() + CACHE_TTL_SECONDS, body, gzipped)
+    return body, gzipped
+
+
+def _cached_json_response(request: Request, cached: Tuple[bytes, Optional[bytes]]) -> Response:
+    body, gzipped = cached
+    headers = {"Vary": "Accept-Encoding"}
+    # Same Accept-Encoding test GZipMiddleware applies, so both paths agree on who gets gzip
+    if gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        body = gzipped
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _trips_body() -> Tuple[bytes, Optional[bytes]]:
+    cached = _cache_get("trips")
+    if cached is None:
+        trips = await get_documents("trip")
+        # Empty results aren't cached, so an unseeded database isn't pinned as [] for the TTL
+        cached = _cache_set("trips", trips) if trips else (b"[]", None)
+    return cached
+
+
+async def _faqs_body() -> Tuple[bytes, Optional[bytes]]:
+    cached = _cache_get("faqs")
+    if cached is None:
+        faqs = await get_documents(
+            "faq", {}, limit=100,
+            sort=[("order", 1), ("question", 1)],
+            projection={"question": 1, "answer": 1, "category": 1, "order": 1},
+        )
+        cached = _cache_set("faqs", faqs) if faqs else (b"[]", None)
+    return cached
+
+
+async def _warm_cache():
+    await _trips_body()
+    await _faqs_body()
+
+
+# Collection names for /test, cached so frequent health probes skip the listCollections command
+COLLECTIONS_TTL_SECONDS = 30
+_collections_cache = None
+
+
+async def _collection_names() -> list:
+    global _collections_cache
+    if _collections_cache is not None and _collections_cache[0] > time.monotonic():
+        return _collections_cache[1]
+    names = await db.list_collection_names()
+    _collections_cache = (time.monotonic() + COLLECTIONS_TTL_SECONDS, names)
+    return names
 
 
 @app.get("/")
-def root():
+async def root():
     return {"service": "Gulf Global Tours API", "status": "ok"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -51,10 +157,10 @@ def test_database():
         if db is not None:
             response["database"] = "✅ Available"
             response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
-            response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
+            response["database_name"] = getattr(db, "name", "✅ Connected")
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await _collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -65,126 +171,135 @@ def test_database():
     return response
 
 
-# Seed default data if empty
+# Seed content, validated once at import
+SEED_TRIPS = [
+    Trip(
+        title="Dimaniyat Island Day Trip",
+        trip_type="dimaniyat",
+        description="Explore the pristine Dimaniyat Islands aboard our 11.3m Looker 370 glass-bottom boat. Snorkel vibrant reefs, spot sea turtles, and enjoy a beach stop.",
+        location="Dimaniyat Islands, Oman",
+        price_per_person=35.0,
+        capacity=20,
+        duration_hours=5.0,
+        highlights=[
+            "Snorkeling coral reefs",
+            "Sea turtles and marine life",
+            "Beachtime on a protected island",
+            "Glass-bottom reef viewing"
+        ],
+        includes=["Captain & crew", "Snorkel gear", "Water & soft drinks"],
+        images=[
+            "/images/dimaniyat-1.jpg",
+            "/images/dimaniyat-2.jpg",
+            "/images/looker370.jpg"
+        ],
+    ).model_dump(),
+    Trip(
+        title="Muscat Sunset Cruise",
+        trip_type="sunset",
+        description="A golden-hour cruise along Muscat’s coastline aboard our Looker 370. Take in Al Alam Palace, Muttrah Corniche, and dramatic sea cliffs as the sun sets.",
+        location="Muscat Coastline, Oman",
+        price_per_person=20.0,
+        capacity=10,
+        duration_hours=2.0,
+        highlights=[
+            "Golden hour views",
+            "Iconic Muscat landmarks",
+            "Relaxed vibes on calm waters",
+            "Great photo opportunities"
+        ],
+        includes=["Captain & crew", "Water & soft drinks"],
+        images=[
+            "/images/sunset-1.jpg",
+            "/images/sunset-2.jpg",
+            "/images/looker370.jpg"
+        ],
+    ).model_dump(),
+]
+
+SEED_FAQS = [
+    {"question": "Where do trips depart from?", "answer": "Muscat, Oman. Exact marina details shared upon booking.", "category": "general", "order": 1},
+    {"question": "How many guests can join?", "answer": "Up to 18-20 for Dimaniyat and 8-10 for sunset trips.", "category": "capacity", "order": 2},
+    {"question": "What should I bring?", "answer": "Sunscreen, hat, towel, and swimwear. We provide water, soft drinks, and snorkel gear for day trips.", "category": "prep", "order": 3},
+    {"question": "Is the glass bottom safe?", "answer": "Yes. The Looker 370 is purpose-built with reinforced glass for reef viewing.", "category": "safety", "order": 4},
+]
+
+
+# Seed default data; missing entries are upserted so repeat calls are no-ops
 @app.post("/seed")
-def seed():
-    # Trips
-    trips_col = db["trip"]
-    if trips_col.count_documents({}) == 0:
-        seed_trips = [
-            Trip(
-                title="Dimaniyat Island Day Trip",
-                trip_type="dimaniyat",
-                description="Explore the pristine Dimaniyat Islands aboard our 11.3m Looker 370 glass-bottom boat. Snorkel vibrant reefs, spot sea turtles, and enjoy a beach stop.",
-                location="Dimaniyat Islands, Oman",
-                price_per_person=35.0,
-                capacity=20,
-                duration_hours=5.0,
-                highlights=[
-                    "Snorkeling coral reefs",
-                    "Sea turtles and marine life",
-                    "Beachtime on a protected island",
-                    "Glass-bottom reef viewing"
-                ],
-                includes=["Captain & crew", "Snorkel gear", "Water & soft drinks"],
-                images=[
-                    "/images/dimaniyat-1.jpg",
-                    "/images/dimaniyat-2.jpg",
-                    "/images/looker370.jpg"
-                ],
-            ).model_dump(),
-            Trip(
-                title="Muscat Sunset Cruise",
-                trip_type="sunset",
-                description="A golden-hour cruise along Muscat’s coastline aboard our Looker 370. Take in Al Alam Palace, Muttrah Corniche, and dramatic sea cliffs as the sun sets.",
-                location="Muscat Coastline, Oman",
-                price_per_person=20.0,
-                capacity=10,
-                duration_hours=2.0,
-                highlights=[
-                    "Golden hour views",
-                    "Iconic Muscat landmarks",
-                    "Relaxed vibes on calm waters",
-                    "Great photo opportunities"
-                ],
-                includes=["Captain & crew", "Water & soft drinks"],
-                images=[
-                    "/images/sunset-1.jpg",
-                    "/images/sunset-2.jpg",
-                    "/images/looker370.jpg"
-                ],
-            ).model_dump(),
-        ]
-        trips_col.insert_many(seed_trips)
-
-    # FAQs
-    faq_col = db["faq"]
-    if faq_col.count_documents({}) == 0:
-        faq_col.insert_many([
-            {"question": "Where do trips depart from?", "answer": "Muscat, Oman. Exact marina details shared upon booking.", "category": "general", "order": 1},
-            {"question": "How many guests can join?", "answer": "Up to 18-20 for Dimaniyat and 8-10 for sunset trips.", "category": "capacity", "order": 2},
-            {"question": "What should I bring?", "answer": "Sunscreen, hat, towel, and swimwear. We provide water, soft drinks, and snorkel gear for day trips.", "category": "prep", "order": 3},
-            {"question": "Is the glass bottom safe?", "answer": "Yes. The Looker 370 is purpose-built with reinforced glass for reef viewing.", "category": "safety", "order": 4},
-        ])
-
+async def seed():
+    await db["trip"].bulk_write(
+        [UpdateOne({"trip_type": t["trip_type"]}, {"$setOnInsert": t}, upsert=True) for t in SEED_TRIPS],
+        ordered=False,
+    )
+
+    await db["faq"].bulk_write(
+        [UpdateOne({"question": f["question"]}, {"$setOnInsert": f}, upsert=True) for f in SEED_FAQS],
+        ordered=False,
+    )
+
+    _response_cache.clear()
     return {"status": "ok"}
 
 
 # Public content endpoints
 @app.get("/trips")
-def get_trips():
-    trips = get_documents("trip")
-    for t in trips:
-        t["_id"] = str(t["_id"])  # jsonify
-    return trips
+async def get_trips(request: Request):
+    return _cached_json_response(request, await _trips_body())
 
 
 @app.get("/faqs")
-def get_faqs():
-    faqs = get_documents("faq", {}, limit=100)
-    for f in faqs:
-        f["_id"] = str(f["_id"])  # jsonify
-    # sort by order then question
-    faqs.sort(key=lambda x: (x.get("order", 0), x.get("question", "")))
-    return faqs
+async def get_faqs(request: Request):
+    return _cached_json_response(request, await _faqs_body())
 
 
 @app.get("/reviews")
-def get_reviews():
-    reviews = get_documents("review", {}, limit=50)
-    for r in reviews:
-        r["_id"] = str(r["_id"])  # jsonify
+async def get_reviews():
+    # Reviews stored without trip_type still report it as null
+    reviews = await get_documents("review", {}, limit=50, defaults={"trip_type": None})
     return reviews
 
 
 # Booking and inquiries
 @app.post("/book")
-def create_booking(payload: Booking):
+async def create_booking(payload: Booking):
     # Validate capacity against trips
-    trip = db["trip"].find_one({"trip_type": payload.trip_type, "is_active": True})
+    trip = await db["trip"].find_one(
+        {"trip_type": payload.trip_type, "is_active": True},
+        {"capacity": 1, "_id": 0},
+    )
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     if payload.people_count > trip.get("capacity", 0):
         raise HTTPException(status_code=400, detail=f"Maximum capacity is {trip.get('capacity')} for this trip")
 
-    booking_id = create_document("booking", payload)
+    booking_id = await create_document("booking", payload)
     return {"status": "received", "id": booking_id}
 
 
 @app.post("/inquire")
-def create_inquiry(payload: Inquiry):
-    inquiry_id = create_document("inquiry", payload)
+async def create_inquiry(payload: Inquiry):
+    inquiry_id = await inquiry_batcher.insert(payload)
     return {"status": "received", "id": inquiry_id}
 
 
 # Simple create-review endpoint
 @app.post("/review")
-def add_review(payload: Review):
-    review_id = create_document("review", payload)
+async def add_review(payload: Review):
+    review_id = await review_batcher.insert(payload)
     return {"status": "received", "id": review_id}
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        access_log=False,
+    )
@@ -4,10 +4,13 @@ Database Schemas for Gulf Global Tours
 Each Pydantic model below represents a MongoDB collection. The collection
 name is the lowercase of the class name (e.g., Trip -> "trip").
 """
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, List, Optional
 from datetime import date
 
+# Lightweight email check: a single regex pass instead of email-validator's full parse
+Email = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$", max_length=254)]
+
 class Trip(BaseModel):
     title: str = Field(..., description="Trip display name")
     trip_type: str = Field(..., description="Unique key, e.g., 'dimaniyat' or 'sunset'")
@@ -22,9 +25,11 @@ class Trip(BaseModel):
     is_active: bool = Field(default=True)
 
 class Booking(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, frozen=True)
+
     trip_type: str = Field(..., description="Trip key the booking is for")
     name: str
-    email: EmailStr
+    email: Email
     phone: str
     date: date
     people_count: int = Field(..., ge=1)
@@ -32,6 +37,8 @@ class Booking(BaseModel):
     status: str = Field(default="pending", description="pending|confirmed|cancelled")
 
 class Review(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, frozen=True)
+
     name: str
     rating: int = Field(..., ge=1, le=5)
     comment: str
@@ -44,7 +51,9 @@ class FAQ(BaseModel):
     order: int = Field(default=0)
 
 class Inquiry(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, frozen=True)
+
     name: str
-    email: EmailStr
+    email: Email
     subject: str
     message: str